@@ -2,34 +2,49 @@
 """Simple CLI for the EpomakerController package."""
 
 import click
-import tkinter as tk
 import logging
+from pathlib import Path
 
+from . import daemon
 from .epomakercontroller import EpomakerController
 
 
 logging.basicConfig(
-    level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(message)s"
+    level=logging.WARNING, format="%(asctime)s [%(levelname)s] %(message)s"
 )
 
 
 @click.group()
-def cli() -> None:
+@click.option("-v", "--verbose", is_flag=True, help="Print debug logs.")
+def cli(verbose: bool) -> None:
     """A simple CLI for the EpomakerController."""
-    pass
+    if verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
 
 
 def _upload_file(file_path: str, is_animation: bool) -> None:
     """Helper function to upload an image or animation to the Epomaker device."""
-    controller = None
     upload_type = "animation" if is_animation else "image"
-    logging.debug(f"Starting upload for {upload_type}: {file_path}")
+    logging.debug("Starting upload for %s: %s", upload_type, file_path)
 
+    # Hand the upload to a running daemon, which already has the device open
     try:
-        controller = EpomakerController()
-        logging.debug("EpomakerController initialized.")
+        response = daemon.request(
+            f"upload_{upload_type}", path=str(Path(file_path).resolve())
+        )
+    except Exception as e:
+        logging.exception("Exception occurred during %s upload.", upload_type)
+        click.echo(f"Failed to upload {upload_type}: {e}")
+        return
+    if response is not None:
+        if response["ok"]:
+            click.echo(f"{upload_type.capitalize()} uploaded successfully.")
+        else:
+            click.echo(f"Failed to upload {upload_type}: {response['error']}")
+        return
 
-        if controller.open_device():
+    try:
+        with EpomakerController() as controller:
             logging.debug("Device opened successfully.")
             print(
                 f"Uploading {upload_type}, you should see the status on the keyboard screen.\n"
@@ -40,19 +55,11 @@ def _upload_file(file_path: str, is_animation: bool) -> None:
             else:
                 controller.send_image(file_path)
 
-            logging.info(f"{upload_type.capitalize()} uploaded successfully.")
-            click.echo(f"{upload_type.capitalize()} uploaded successfully.")
-        else:
-            logging.warning("Failed to open device.")
-            click.echo("Failed to open device.")
+        logging.info("%s uploaded successfully.", upload_type.capitalize())
+        click.echo(f"{upload_type.capitalize()} uploaded successfully.")
     except Exception as e:
-        logging.exception(f"Exception occurred during {upload_type} upload.")
+        logging.exception("Exception occurred during %s upload.", upload_type)
         click.echo(f"Failed to upload {upload_type}: {e}")
-    finally:
-        if controller:
-            logging.debug("Closing device.")
-            controller.close_device()
-            logging.debug("Device closed.")
 
 
 @cli.command()
@@ -69,6 +76,12 @@ def upload_animation(file_path: str) -> None:
     _upload_file(file_path, is_animation=True)
 
 
+@cli.command()
+def start_daemon() -> None:
+    """Keep the Epomaker device open and serve uploads from other commands."""
+    daemon.serve()
+
+
 @cli.command()
 @click.option(
     "--print",
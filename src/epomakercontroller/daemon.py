@@ -0,0 +1,232 @@
+"""Daemon module.
+
+This module contains a small daemon that keeps the Epomaker device open between
+CLI invocations, so each command doesn't have to enumerate and open the device.
+
+The daemon listens on a Unix socket and accepts one JSON request per line, e.g.
+{"op": "upload_image", "path": "/abs/path.png"}, and replies with {"ok": true}
+or {"ok": false, "error": "..."}.
+"""
+
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import stat
+import tempfile
+from pathlib import Path
+from types import FrameType
+from typing import Any, Optional
+
+from .epomakercontroller import EpomakerController
+
+logger = logging.getLogger(__name__)
+
+SOCKET_NAME = "epomakercontroller.sock"
+CONNECT_TIMEOUT = 1.0  # seconds to reach the daemon before doing without it
+REPLY_TIMEOUT = 60.0  # seconds to wait for an upload to finish
+CLIENT_TIMEOUT = 5.0  # seconds the daemon waits on a silent client
+
+
+def socket_path() -> Path:
+    """Returns the path of the daemon socket.
+
+    Returns:
+        Path: The socket in $XDG_RUNTIME_DIR, or a per-user one in the temp dir.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / SOCKET_NAME
+    return Path(tempfile.gettempdir()) / f"{os.getuid()}-{SOCKET_NAME}"
+
+
+def _is_own_socket(path: Path) -> bool:
+    """Whether path is a socket owned by the current user, without following links.
+
+    The temp dir fallback is shared, so anyone could have created the socket first.
+    """
+    try:
+        info = os.lstat(path)
+    except FileNotFoundError:
+        return False
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid()
+
+
+def request(
+    op: str, *, socket_file: Optional[Path] = None, **kwargs: Any
+) -> Optional[dict[str, Any]]:
+    """Sends a request to a running daemon.
+
+    Args:
+        op (str): The operation to run, e.g. "upload_image".
+        socket_file (Optional[Path]): The daemon's socket (default: socket_path()).
+        **kwargs: Arguments of the operation.
+
+    Raises:
+        IOError: If the daemon did not reply, or closed the connection without
+            replying.
+
+    Returns:
+        Optional[dict[str, Any]]: The daemon's reply, None if no daemon is running
+            or it could not be reached in time.
+    """
+    path = socket_file or socket_path()
+    if not os.path.lexists(path):
+        return None
+    if not _is_own_socket(path):
+        logger.warning("Not using %s, it is not a socket owned by this user", path)
+        return None
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(str(path))
+        except (ConnectionRefusedError, FileNotFoundError):
+            # Stale socket left behind by a daemon that didn't shut down cleanly
+            return None
+        except socket.timeout:
+            logger.warning("Daemon on %s is not answering, not using it", path)
+            return None
+
+        # Once the request is sent the daemon may already be uploading it, so
+        # from here on a timeout is an error rather than a reason to fall back
+        sock.settimeout(REPLY_TIMEOUT)
+        try:
+            sock.sendall(json.dumps({"op": op, **kwargs}).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as f:
+                reply = f.readline()
+        except socket.timeout as e:
+            raise IOError("Daemon did not reply in time") from e
+
+    if not reply:
+        raise IOError("Daemon closed the connection without replying")
+    response: dict[str, Any] = json.loads(reply)
+    return response
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handles the JSON requests of a single client connection."""
+
+    server: "EpomakerDaemon"
+    # Requests are served one at a time, a client that stalls must not block
+    # everyone else
+    timeout = CLIENT_TIMEOUT
+
+    def handle(self) -> None:
+        try:
+            self._handle_lines()
+        except socket.timeout:
+            logger.warning("Dropping client that stopped sending")
+
+    def _handle_lines(self) -> None:
+        for line in self.rfile:
+            try:
+                self.server.dispatch(json.loads(line))
+                response: dict[str, Any] = {"ok": True}
+            except Exception as e:
+                logger.exception("Request failed")
+                response = {"ok": False, "error": str(e)}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class EpomakerDaemon(socketserver.UnixStreamServer):
+    """Serves requests for a single, already opened, EpomakerController.
+
+    Requests are handled one at a time, so only one upload talks to the device
+    at any moment.
+    """
+
+    def __init__(self, controller: EpomakerController, path: Optional[Path] = None):
+        """Initializes the EpomakerDaemon object.
+
+        Args:
+            controller (EpomakerController): The controller to send requests to.
+            path (Optional[Path]): The socket path (default: socket_path()).
+
+        Raises:
+            RuntimeError: If another daemon is already listening on the socket, or
+                the socket path is taken by something that isn't our socket.
+        """
+        self.controller = controller
+        self.path = path or socket_path()
+
+        if os.path.lexists(self.path):
+            if not _is_own_socket(self.path):
+                raise RuntimeError(
+                    f"{self.path} exists and is not a socket owned by this user"
+                )
+            if request("ping", socket_file=self.path) is not None:
+                raise RuntimeError(f"Daemon already running on {self.path}")
+            self.path.unlink()
+
+        # Bind with an owner-only umask, so the socket is never reachable by
+        # other users, not even between bind() and a chmod()
+        umask = os.umask(0o077)
+        try:
+            super().__init__(str(self.path), _RequestHandler)
+        finally:
+            os.umask(umask)
+
+    def dispatch(self, req: dict[str, Any]) -> None:
+        """Runs a single request against the controller.
+
+        Args:
+            req (dict[str, Any]): The decoded request.
+
+        Raises:
+            ValueError: If the operation is unknown.
+        """
+        op = req.get("op")
+        logger.info("Handling request: %s", op)
+        if op == "ping":
+            return
+
+        # The device is dropped after a failed upload, reopen it on demand
+        if self.controller.device is None and not self.controller.open_device():
+            raise IOError("Failed to open device")
+
+        try:
+            if op == "upload_image":
+                self.controller.send_image(req["path"])
+            elif op == "upload_animation":
+                self.controller.send_animation(req["path"])
+            else:
+                raise ValueError(f"Unknown operation: {op}")
+        except IOError:
+            self.controller.close_device()
+            raise
+
+    def server_close(self) -> None:
+        """Closes the socket and removes the socket file."""
+        super().server_close()
+        self.path.unlink(missing_ok=True)
+
+
+def _exit_on_signal(sig: int, frame: Optional[FrameType]) -> None:
+    """Leaves serve_forever, so the socket is removed and the device closed."""
+    raise SystemExit(0)
+
+
+def serve() -> None:
+    """Opens the device and serves requests until interrupted."""
+    with EpomakerController() as controller, EpomakerDaemon(controller) as server:
+        # The controller's own handlers exit on the spot, which would skip
+        # server_close and leave the socket file behind
+        signal.signal(signal.SIGINT, _exit_on_signal)
+        signal.signal(signal.SIGTERM, _exit_on_signal)
+        print(f"Listening on {server.path}")
+        server.serve_forever()
+
+
+def main() -> None:
+    """Entry point for the epomaker-daemon script."""
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
+    )
+    serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,20 @@ This module contains the EpomakerController class, which represents a controller
 for an Epomaker USB HID device.
 """
 
-import dataclasses
+from __future__ import annotations
+
+from collections import OrderedDict
+import functools
+import hashlib
 from json import dumps
 import os
 import time
-from typing import Any, Union, Optional
-import hid  # type: ignore[import-not-found]
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Union, Optional
 import signal
 import subprocess
 from types import FrameType
-import re
-from PIL import Image, UnidentifiedImageError, ImageSequence
+import shlex
+from appdirs import user_cache_dir  # type: ignore[import-untyped]
 import logging
 from pathlib import Path
 from .commands.data.constants import (
@@ -25,11 +28,27 @@ from .commands.data.constants import (
     IMAGE_DIMENSIONS,
 )
 
+# hid, numpy and PIL are slow to import, they are only imported once needed so
+# the CLI starts quickly
+if TYPE_CHECKING:
+    import numpy as np
+    from PIL import Image
+
 CONST_HEADER = bytes([0x29, 0x00, 0x01, 0x00])
 BASE_ADDRESS = 0x0000389D
 HEADER_SIZE = 4 + 2 + 2  # constant + incrementing nibble + decrementing nibble
 MAX_PACKET_SIZE = 64
+REPORT_ID = b"\x00"  # prefixed to every packet sent to the device
 PAYLOAD_SIZE = MAX_PACKET_SIZE - HEADER_SIZE  # 56 bytes for pixel data
+PACKET_INTERVAL = 0.005  # gap kept between reports, in seconds
+FRAME_SIZE = MAX_NUM_PIXELS * 3  # RGB bytes per encoded image
+CACHE_DIR = Path(user_cache_dir("epomakercontroller"))
+CACHE_VERSION = 2  # bump whenever the encoded output for a file changes
+CACHE_MAX_FILES = 64  # cache files kept on disk, least recently used go first
+MEMORY_CACHE_SIZE = 16  # files whose encoding is also kept in memory
+# The last packet of frame i counts down from 0x49, and the frame count goes in
+# a single header byte
+MAX_ANIMATION_FRAMES = 0x49 + 1
 FIRST_PACKET = bytes.fromhex(
     "a9000100540600fb00003c0900000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000"
 )
@@ -42,6 +61,53 @@ FIRST_ANIMATION_PACKET = bytes.fromhex(
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=None)
+def _packet_counters(base_address: int, count: int) -> np.ndarray:
+    """Builds the nibble bytes (bytes 4-7) for each packet of a frame.
+
+    Args:
+        base_address (int): The starting value of the decrementing nibble.
+        count (int): The number of packets in the frame.
+
+    Returns:
+        np.ndarray: A read-only (count, 4) array of the incrementing (little
+            endian) and decrementing (big endian) nibbles of each packet.
+    """
+    import numpy as np
+
+    incrementing = np.arange(count, dtype=np.uint16)
+    decrementing = np.uint16(base_address) - incrementing
+    counters = np.concatenate(
+        [
+            incrementing.astype("<u2").view(np.uint8).reshape(count, 2),
+            decrementing.astype(">u2").view(np.uint8).reshape(count, 2),
+        ],
+        axis=1,
+    )
+    counters.flags.writeable = False
+    return counters
+
+
+@functools.lru_cache(maxsize=64)
+def _encode_pixels(pixels: bytes) -> bytes:
+    """Reorders raw (rows, cols, rgb) pixels of the screen size column by column.
+
+    This is cached on the raw pixels since the same images tend to be sent over
+    and over, e.g. by the stock ticker.
+
+    Args:
+        pixels (bytes): The row-major RGB pixels.
+
+    Returns:
+        bytes: Encoded image data.
+    """
+    import numpy as np
+
+    rows, cols = IMAGE_DIMENSIONS
+    image = np.frombuffer(pixels, dtype=np.uint8).reshape(rows, cols, 3)
+    return image.transpose(1, 0, 2).tobytes()
+
+
 class EpomakerController:
     """EpomakerController class represents a controller for an Epomaker USB HID device.
 
@@ -59,20 +125,38 @@ class EpomakerController:
             byte string format.
     """
 
-    def __init__(self, dry_run=False) -> None:
+    def __init__(
+        self,
+        dry_run=False,
+        packet_interval: float = PACKET_INTERVAL,
+        measure_packet_interval: bool = False,
+    ) -> None:
         """Initializes the EpomakerController object.
 
         Args:
             vendor_id (int): The vendor ID of the USB HID device.
             dry_run (bool): Whether to run in dry run mode (default: False).
+            packet_interval (float): Minimum time in seconds between two reports
+                sent to the device (default: PACKET_INTERVAL).
+            measure_packet_interval (bool): Shorten the gap to the time the device
+                takes to answer the report read of each upload, never going over
+                packet_interval. Not checked against the firmware's processing
+                time, only use it if uploads still show up fine (default: False).
         """
         self.dry_run = dry_run
+        self.packet_interval = packet_interval
+        self.measure_packet_interval = measure_packet_interval
+        self._packet_interval = packet_interval
+        self._last_packet_time = 0.0
         self.vendor_id = VENDOR_ID
         self.use_wireless = False
         self.product_ids: list[int] = PRODUCT_IDS_WIRED
         self.device_description = ""
+        import hid  # type: ignore[import-not-found]
+
         self.device = hid.device()
         self.device_list: list[dict[str, Any]] = []
+        self._encoded_files: OrderedDict[tuple[Any, ...], list[bytes]] = OrderedDict()
         print(
             """WARNING: If this program errors out or you cancel early, the keyboard
               may become unresponsive. It should work fine again if you unplug and plug
@@ -92,8 +176,18 @@ class EpomakerController:
         self.close_device()
         os._exit(0)  # Exit immediately after closing the device
 
-    def __del__(self) -> None:
-        """Destructor to ensure the device is closed."""
+    def __enter__(self) -> EpomakerController:
+        """Opens the device for the duration of a with block.
+
+        Raises:
+            IOError: If the device could not be opened.
+        """
+        if not self.open_device():
+            raise IOError("Failed to open device")
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Closes the device when leaving a with block."""
         self.close_device()
 
     def open_device(self, only_info: bool = False) -> bool:
@@ -132,8 +226,12 @@ class EpomakerController:
         Returns:
             int | None: The product ID if found, None otherwise.
         """
+        import hid
+
+        # One bus walk for every device of the vendor, then filter here
+        devices = hid.enumerate(self.vendor_id, 0)
         for pid in self.product_ids:
-            self.device_list = hid.enumerate(self.vendor_id, pid)
+            self.device_list = [d for d in devices if d["product_id"] == pid]
             if self.device_list:
                 return pid
         return None
@@ -144,6 +242,8 @@ class EpomakerController:
         Args:
             device_path (bytes): The path to the device.
         """
+        import hid
+
         try:
             self.device = hid.device()
             self.device.open_path(device_path)
@@ -181,20 +281,19 @@ class EpomakerController:
             temp_file.write(rule_content)
 
         # Move the file to the correct location, reload rules
-
-        move_command = ["mv", temp_file_path, rule_file_path]
-        reload_command = ["udevadm", "control", "--reload-rules"]
-        trigger_command = ["udevadm", "trigger"]
+        # All in one shell so sudo only has to authenticate once
+        script = (
+            f"mv {shlex.quote(temp_file_path)} {shlex.quote(rule_file_path)}"
+            " && udevadm control --reload-rules"
+            " && udevadm trigger"
+        )
+        command = ["sh", "-c", script]
 
         if os.geteuid() != 0:
             # Use sudo if not root
-            move_command = ["sudo"] + move_command
-            reload_command = ["sudo"] + reload_command
-            trigger_command = ["sudo"] + trigger_command
+            command = ["sudo"] + command
 
-        subprocess.run(move_command, check=True)
-        subprocess.run(reload_command, check=True)
-        subprocess.run(trigger_command, check=True)
+        subprocess.run(command, check=True)
 
         print("Rule generated successfully")
 
@@ -212,12 +311,6 @@ class EpomakerController:
             )
         )
 
-    @dataclasses.dataclass
-    class HIDInfo:
-        device_name: str
-        event_path: str
-        hid_path: Optional[str] = None
-
     def _find_device_path(self) -> Optional[bytes]:
         """Finds the device path with the specified interface number.
 
@@ -232,54 +325,6 @@ class EpomakerController:
 
         return None
 
-    @staticmethod
-    def _get_hid_infos(input_dir: str, description: str) -> list[HIDInfo]:
-        """Retrieve HID information based on the given description."""
-        hid_infos = []
-        for event in os.listdir(input_dir):
-            if event.startswith("event"):
-                device_name_path = os.path.join(input_dir, event, "device", "name")
-                try:
-                    with open(device_name_path, "r", encoding="utf-8") as f:
-                        device_name = f.read().strip()
-                        if re.search(description, device_name):
-                            event_path = os.path.join(input_dir, event)
-                            hid_infos.append(
-                                EpomakerController.HIDInfo(device_name, event_path)
-                            )
-                except FileNotFoundError:
-                    continue
-        return hid_infos
-
-    @staticmethod
-    def _populate_hid_paths(hid_infos: list[HIDInfo]) -> None:
-        """Populate the HID paths for each HIDInfo object in the list."""
-        for hi in hid_infos:
-            device_symlink = os.path.join(hi.event_path, "device")
-            if not os.path.islink(device_symlink):
-                print(f"No 'device' symlink found in {hi.event_path}")
-                continue
-
-            hid_device_path = os.path.realpath(device_symlink)
-            match = re.search(r"\b\d+-[\d.]+:\d+\.\d+\b", hid_device_path)
-            hi.hid_path = match.group(0) if match else None
-
-    def _select_device_path(self, hid_infos: list[HIDInfo]) -> Optional[bytes]:
-        """Select the appropriate device path based on interface preference."""
-        device_name_filter = "Wireless" if self.use_wireless else "Wired"
-        filtered_devices = [h for h in hid_infos if device_name_filter in h.device_name]
-
-        if not filtered_devices:
-            print(f"Could not find {device_name_filter} interface")
-            return None
-
-        selected_device = filtered_devices[0]
-        return (
-            selected_device.hid_path.encode("utf-8")
-            if selected_device.hid_path
-            else None
-        )
-
     @staticmethod
     def _assert_range(value: int, r: range | None = None) -> bool:
         """Asserts that a value is within a specified range.
@@ -295,130 +340,370 @@ class EpomakerController:
             r = range(0, 100)  # 0 to 99
         return value in r
 
-    def _rgb_to_hex(self, rgb: tuple) -> bytes:
-        """Converts an RGB tuple to a bytes object representing a hexadecimal color."""
-        hex_str = "{:02x}{:02x}{:02x}".format(*rgb)
-        return bytes.fromhex(hex_str)
+    @staticmethod
+    def _image_to_pixels(
+        image: Image.Image, resample: Optional[Image.Resampling] = None
+    ) -> np.ndarray:
+        """Converts an image to a (rows, cols, rgb) array of the screen size.
+
+        Args:
+            image (Image.Image): The image to convert.
+            resample (Optional[Image.Resampling]): Filter used when resizing to
+                the screen size (default: NEAREST, smoother filters gain little
+                at 60x9).
+
+        Returns:
+            np.ndarray: The RGB pixels of the image.
+        """
+        import numpy as np
+        from PIL import Image
+
+        if resample is None:
+            resample = Image.Resampling.NEAREST
+
+        logging.debug("Original image mode: %s, size: %s", image.mode, image.size)
+        rows, cols = IMAGE_DIMENSIONS
+
+        # Nearest-neighbour picks the same pixels whatever the mode, so shrink
+        # the image before converting it and only the small one gets converted
+        if resample != Image.Resampling.NEAREST:
+            image = image.convert("RGB")
+
+        if (image.height, image.width) != IMAGE_DIMENSIONS:
+            logging.debug("Resizing image from %s to %s", image.size, (cols, rows))
+            image = image.resize((cols, rows), resample)
+
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+
+        return np.frombuffer(image.tobytes(), dtype=np.uint8).reshape(rows, cols, 3)
 
     def _encode_image(
-        self, image_input: Union[str, Path, Image.Image], debug: bool = False
-    ) -> bytearray:
+        self,
+        image_input: Union[str, Path, Image.Image, np.ndarray],
+        debug: bool = False,
+        resample: Optional[Image.Resampling] = None,
+    ) -> bytes:
         """
-        Encodes an image to a bytearray suitable for the Epomaker device.
+        Encodes an image to bytes suitable for the Epomaker device.
 
         Args:
-            image_input (Union[str, Path, Image.Image]): Path to the image file or a PIL image object.
+            image_input (Union[str, Path, Image.Image, np.ndarray]): Path to the
+                image file, a PIL image object, or already decoded (rows, cols, rgb)
+                uint8 pixels of the screen size.
             debug (bool): If True, return a dummy image with fixed pixel data.
+            resample (Optional[Image.Resampling]): Filter used when resizing to
+                the screen size (default: NEAREST, smoother filters gain little
+                at 60x9).
+
+        Raises:
+            TypeError: If image_input is not one of the supported types.
+            ValueError: If decoded pixels don't match the screen size, or aren't
+                uint8.
 
         Returns:
-            bytearray: Encoded image data.
+            bytes: Encoded image data.
         """
         if debug:
             logging.debug("Debug mode active. Returning dummy image data.")
-            return bytearray.fromhex("7e7321" * MAX_NUM_PIXELS)
+            return b"\x7e\x73\x21" * MAX_NUM_PIXELS
+
+        import numpy as np
+        from PIL import Image
 
-        if isinstance(image_input, (str, Path)):
-            logging.debug(f"Opening image from path: {image_input}")
-            image = Image.open(image_input)
+        if isinstance(image_input, np.ndarray):
+            logging.debug("Using provided pixel array.")
+            pixels = image_input
+        elif isinstance(image_input, (str, Path)):
+            logging.debug("Opening image from path: %s", image_input)
+            pixels = self._image_to_pixels(Image.open(image_input), resample)
         elif isinstance(image_input, Image.Image):
             logging.debug("Using provided PIL.Image object.")
-            image = image_input
+            pixels = self._image_to_pixels(image_input, resample)
         else:
-            raise TypeError("image_input must be a file path or PIL.Image.Image")
-
-        logging.debug(f"Original image mode: {image.mode}, size: {image.size}")
-        image = image.convert("RGB")
+            raise TypeError(
+                "image_input must be a file path, PIL.Image.Image or numpy.ndarray"
+            )
 
-        if (image.height, image.width) != IMAGE_DIMENSIONS:
-            # todo fix this so you dont have to reverse the tuple
-            logging.debug(
-                f"Resizing image from {image.size} to {IMAGE_DIMENSIONS[::-1]}"
+        if pixels.shape != (*IMAGE_DIMENSIONS, 3):
+            raise ValueError(
+                f"Expected pixels of shape {(*IMAGE_DIMENSIONS, 3)}, got {pixels.shape}"
             )
-            image = image.resize(IMAGE_DIMENSIONS[::-1])
+        if pixels.dtype != np.uint8:
+            raise ValueError(f"Expected uint8 pixels, got {pixels.dtype}")
 
-        pixel_data = bytearray()
         rows, cols = IMAGE_DIMENSIONS
 
-        logging.debug(f"Encoding image pixels in column-major order ({cols}x{rows})")
-        for col in range(cols):
-            for row in range(rows):
-                rgb = image.getpixel((col, row))
-                pixel_data.extend(self._rgb_to_hex(rgb))
+        logging.debug("Encoding image pixels in column-major order (%dx%d)", cols, rows)
+        # Pixels are (rows, cols, rgb), the device wants each column in turn
+        pixel_data = _encode_pixels(pixels.tobytes())
 
-        logging.debug(f"Encoded {len(pixel_data)} bytes of pixel data")
+        logging.debug("Encoded %d bytes of pixel data", len(pixel_data))
         return pixel_data
 
+    @staticmethod
+    def _cache_path(file_path: Union[str, Path], kind: str) -> Path:
+        """Returns the cache file for the encoded contents of a file.
+
+        Args:
+            file_path (Union[str, Path]): The image or animation file.
+            kind (str): What the file is encoded as, e.g. "image" or "animation".
+
+        Returns:
+            Path: The cache file, keyed by the SHA-256 of the file contents.
+        """
+        digest = hashlib.sha256(Path(file_path).read_bytes()).hexdigest()
+        return CACHE_DIR / f"{kind}-v{CACHE_VERSION}-{digest}.bin"
+
+    @staticmethod
+    def _read_cache(cache_path: Path) -> Optional[bytes]:
+        """Reads encoded data from the cache, returns None on a miss."""
+        try:
+            data = cache_path.read_bytes()
+        except OSError:
+            return None
+
+        # The modification time doubles as the last use when pruning
+        try:
+            os.utime(cache_path)
+        except OSError:
+            pass
+        return data
+
+    @staticmethod
+    def _write_cache(cache_path: Path, data: bytes) -> None:
+        """Writes encoded data to the cache, failures are only logged."""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_bytes(data)
+        except OSError as e:
+            logger.warning("Could not write cache file %s: %s", cache_path, e)
+            return
+
+        EpomakerController._prune_cache(cache_path.parent)
+
+    @staticmethod
+    def _prune_cache(cache_dir: Path) -> None:
+        """Removes the least recently used cache files beyond CACHE_MAX_FILES."""
+        try:
+            files = sorted(
+                cache_dir.glob("*.bin"), key=lambda f: f.stat().st_mtime, reverse=True
+            )
+            for stale in files[CACHE_MAX_FILES:]:
+                stale.unlink()
+        except OSError as e:
+            logger.warning("Could not prune cache directory %s: %s", cache_dir, e)
+
+    @staticmethod
+    def _memory_cache_key(file_path: Union[str, Path], kind: str) -> tuple[Any, ...]:
+        """Returns the key of a file in the in-memory encoding cache.
+
+        Unlike the cache file, this doesn't read the file: it is keyed by path,
+        modification time and size.
+        """
+        stat = Path(file_path).stat()
+        return (kind, str(Path(file_path).resolve()), stat.st_mtime_ns, stat.st_size)
+
+    def _remember_encoding(self, key: tuple[Any, ...], frames: list[bytes]) -> None:
+        """Keeps the encoding of a file in memory, evicting the oldest one."""
+        self._encoded_files[key] = frames
+        self._encoded_files.move_to_end(key)
+        while len(self._encoded_files) > MEMORY_CACHE_SIZE:
+            self._encoded_files.popitem(last=False)
+
+    def _load_encoded_image(self, image_input: Union[str, Path, Image.Image]) -> bytes:
+        """Encodes an image, reusing the cached encoding of image files.
+
+        Args:
+            image_input (Union[str, Path, Image.Image]): Path to the image file or a PIL image object.
+
+        Returns:
+            bytes: Encoded image data.
+        """
+        if not isinstance(image_input, (str, Path)):
+            return self._encode_image(image_input)
+
+        key = self._memory_cache_key(image_input, "image")
+        if key in self._encoded_files:
+            self._encoded_files.move_to_end(key)
+            return self._encoded_files[key][0]
+
+        cache_path = self._cache_path(image_input, "image")
+        image_data = self._read_cache(cache_path)
+        if image_data is not None and len(image_data) == FRAME_SIZE:
+            logger.debug("Using cached encoding: %s", cache_path)
+        else:
+            image_data = self._encode_image(image_input)
+            self._write_cache(cache_path, image_data)
+
+        self._remember_encoding(key, [image_data])
+        return image_data
+
+    def _encode_animation(self, file_path: Path) -> list[bytes]:
+        """Encodes every frame of an animation file.
+
+        Args:
+            file_path (Path): Path to the animation file.
+
+        Raises:
+            ValueError: If the file is not a supported image format.
+
+        Returns:
+            list[bytes]: Encoded data for each frame.
+        """
+        import numpy as np
+        from PIL import Image, ImageSequence, UnidentifiedImageError
+
+        try:
+            with Image.open(file_path) as img:
+                logger.info("Opened animation: %s", file_path)
+                frames = []
+                for i, frame in enumerate(ImageSequence.Iterator(img)):
+                    logger.debug(
+                        "Processing frame %d - mode: %s, size: %s",
+                        i,
+                        frame.mode,
+                        frame.size,
+                    )
+                    frames.append(self._image_to_pixels(frame))
+        except UnidentifiedImageError:
+            raise ValueError(f"Unsupported image format: {file_path}")
+        except Exception as e:
+            logger.error("Failed to process animation: %s", e)
+            raise
+
+        if not frames:
+            return []
+
+        # Frames have to be decoded in order since each builds on the previous
+        # one, but they are all reordered at once as a single array. For frames
+        # this small that is cheaper than handing them out to worker processes.
+        data = np.stack(frames).transpose(0, 2, 1, 3).tobytes()
+        return [data[i : i + FRAME_SIZE] for i in range(0, len(data), FRAME_SIZE)]
+
+    def _load_encoded_animation(self, file_path: Path) -> list[bytes]:
+        """Encodes an animation, reusing the cached encoding of the file.
+
+        Args:
+            file_path (Path): Path to the animation file.
+
+        Returns:
+            list[bytes]: Encoded data for each frame.
+        """
+        key = self._memory_cache_key(file_path, "animation")
+        if key in self._encoded_files:
+            self._encoded_files.move_to_end(key)
+            return self._encoded_files[key]
+
+        cache_path = self._cache_path(file_path, "animation")
+        cached = self._read_cache(cache_path)
+        if cached and len(cached) % FRAME_SIZE == 0:
+            logger.debug("Using cached encoding: %s", cache_path)
+            frames = [
+                cached[offset : offset + FRAME_SIZE]
+                for offset in range(0, len(cached), FRAME_SIZE)
+            ]
+        else:
+            frames = self._encode_animation(file_path)
+            if not frames:
+                return frames
+            self._write_cache(cache_path, b"".join(frames))
+
+        self._remember_encoding(key, frames)
+        return frames
+
     def _chunk_data(
         self,
-        data: list[bytearray] | bytearray,
+        data: list[bytes] | bytes,
         base_address: int,
         final_packet_overrides: list[tuple[int, int]] = None,
         per_frame_override: bool = False,
         is_animation: bool = False,
-    ) -> list[bytearray]:
-        if isinstance(data, bytearray):
+    ) -> Iterator[memoryview]:
+        """Splits frames into packets, built one frame at a time as they're consumed.
+
+        Only the packets of the frame being sent are kept in memory, so the first
+        packet can go out before later frames are chunked.
+
+        Yields:
+            memoryview: Each MAX_PACKET_SIZE packet, in order.
+        """
+        if isinstance(data, (bytes, bytearray)):
             data = [data]
 
-        packets = []
+        import numpy as np
 
-        for frame_index, frame_data in enumerate(data):
-            incrementing_nibble = 0
-            decrementing_nibble = base_address
+        position = 0
 
+        for frame_index, frame_data in enumerate(data):
             logger.debug(
-                f"Processing frame {frame_index}, data length: {len(frame_data)}"
+                "Processing frame %d, data length: %d", frame_index, len(frame_data)
             )
 
-            for offset in range(0, len(frame_data), PAYLOAD_SIZE):
-                chunk = frame_data[offset : offset + PAYLOAD_SIZE]
-                packet = bytearray(MAX_PACKET_SIZE)
-
-                # Header: byte 0 is fixed, byte 1 is frame counter, bytes 2-3 depend on image vs animation
-                packet[0] = 0x29
-                packet[1] = frame_index
-                # todo: check that animation does not have more than 255 frames
-                packet[2] = len(data) if is_animation else 0x01
-                packet[3] = 0x32 if is_animation else 0x00
-
-                # Incrementing nibble (2 bytes)
-                packet[4:6] = incrementing_nibble.to_bytes(2, byteorder="little")
-
-                # Decrementing nibble (2 bytes)
-                packet[6:8] = decrementing_nibble.to_bytes(2, byteorder="big")
-
-                # Pixel payload
-                packet[8 : 8 + len(chunk)] = chunk
+            # Every packet is a row of a zeroed buffer, so payloads come padded
+            frame_packet_count = self._packet_count(frame_data)
+            frame_packets = np.zeros(
+                (frame_packet_count, MAX_PACKET_SIZE), dtype=np.uint8
+            )
 
-                # Pad if payload is smaller than max
-                data_size = 8 + len(chunk)
-                if data_size < MAX_PACKET_SIZE:
-                    packet[data_size + 1 :] = b"\x00" * (
-                        MAX_PACKET_SIZE - data_size - 1
-                    )
+            # Every packet of the frame is filled at once, header first
+            # Header: byte 0 is fixed, byte 1 is frame counter, bytes 2-3 depend on image vs animation
+            # Animations are checked against MAX_ANIMATION_FRAMES before this
+            frame_packets[:, 0:4] = (
+                0x29,
+                frame_index,
+                len(data) if is_animation else 0x01,
+                0x32 if is_animation else 0x00,
+            )
+            frame_packets[:, 4:HEADER_SIZE] = _packet_counters(
+                base_address, frame_packet_count
+            )
 
-                logger.debug(
-                    f"Packet #{len(packets)} | Frame: {frame_index} | Offset: {offset} "
-                    f"| Inc: {incrementing_nibble:04x} | Dec: {decrementing_nibble:04x} | Chunk size: {len(chunk)}"
+            # Pixel payload, full rows plus whatever is left for the last packet
+            pixels = np.frombuffer(frame_data, dtype=np.uint8)
+            full_packets, remainder = divmod(len(pixels), PAYLOAD_SIZE)
+            frame_packets[:full_packets, HEADER_SIZE:] = pixels[
+                : full_packets * PAYLOAD_SIZE
+            ].reshape(full_packets, PAYLOAD_SIZE)
+            if remainder:
+                frame_packets[full_packets, HEADER_SIZE : HEADER_SIZE + remainder] = (
+                    pixels[full_packets * PAYLOAD_SIZE :]
                 )
 
-                incrementing_nibble += 1
-                decrementing_nibble -= 1
-
-                packets.append(packet)
+            logger.debug(
+                "Frame %d: packets #%d-#%d | Inc: 0000-%04x | Dec: %04x-%04x",
+                frame_index,
+                position,
+                position + frame_packet_count - 1,
+                frame_packet_count - 1,
+                base_address,
+                base_address - frame_packet_count + 1,
+            )
+            position += frame_packet_count
 
             # Override last packet decrementing nibble if needed
             if per_frame_override and final_packet_overrides:
                 override_value = final_packet_overrides[frame_index]
-                packets[-1][6:8] = bytearray(override_value)
+                frame_packets[-1, 6:8] = override_value
                 logger.debug(
-                    f"Applied final packet override to frame {frame_index}: "
-                    f"{override_value[0]:02x} {override_value[1]:02x}"
+                    "Applied final packet override to frame %d: %02x %02x",
+                    frame_index,
+                    override_value[0],
+                    override_value[1],
                 )
 
-        logger.info(f"Total packets generated: {len(packets)}")
-        return packets
+            frame_view = frame_packets.reshape(-1).data
+            for offset in range(0, len(frame_view), MAX_PACKET_SIZE):
+                yield frame_view[offset : offset + MAX_PACKET_SIZE]
+
+        logger.info("Total packets generated: %d", position)
+
+    @staticmethod
+    def _packet_count(frame_data: bytes) -> int:
+        """Returns the number of packets needed to send a single frame."""
+        return -(-len(frame_data) // PAYLOAD_SIZE)
 
-    def _chunk_image_data(self, image_data: bytearray) -> list[bytearray]:
+    def _chunk_image_data(self, image_data: bytes) -> Iterator[memoryview]:
         return self._chunk_data(
             data=image_data,
             base_address=BASE_ADDRESS,
@@ -427,7 +712,17 @@ class EpomakerController:
             is_animation=False,
         )
 
-    def _chunk_animation_data(self, animation_data: list[bytearray]) -> list[bytearray]:
+    def _chunk_animation_data(
+        self, animation_data: list[bytes]
+    ) -> Iterator[memoryview]:
+        # Packets are only built once they are sent, so anything that can't be
+        # encoded has to be caught here, before the keyboard is in upload mode
+        if len(animation_data) > MAX_ANIMATION_FRAMES:
+            raise ValueError(
+                f"Animation has {len(animation_data)} frames, "
+                f"at most {MAX_ANIMATION_FRAMES} are supported"
+            )
+
         overrides = [(0x34, 0x49 - i) for i in range(len(animation_data))]
         return self._chunk_data(
             data=animation_data,
@@ -437,97 +732,101 @@ class EpomakerController:
             is_animation=True,
         )
 
+    def _wait_packet_interval(self) -> None:
+        """Sleeps only for whatever is left of the gap since the last report."""
+        remaining = self._packet_interval - (time.monotonic() - self._last_packet_time)
+        if remaining > 0:
+            time.sleep(remaining)
+
     def _set_packet(self, packet):
         if self.dry_run:
-            print(f"Dry run: skipping command send: {packet!r}")
+            print(f"Dry run: skipping command send: {bytes(packet)!r}")
         else:
-            self.device.send_feature_report(bytes.fromhex("00") + packet)
-            time.sleep(0.005)
+            self._wait_packet_interval()
+            # hidapi reports a failed transfer by returning -1, not by raising
+            if self.device.send_feature_report(REPORT_ID + packet) < 0:
+                raise IOError("Failed to send report to device")
+            self._last_packet_time = time.monotonic()
 
     def _get_packet(self, id=0x00):
         if self.dry_run:
             print(f"Dry run: skipping get_feature_report({id}, 64)")
         else:
+            self._wait_packet_interval()
+            start = time.monotonic()
             self.device.get_feature_report(0, MAX_PACKET_SIZE + 1)
-            time.sleep(0.005)
+            self._last_packet_time = time.monotonic()
+
+            # Pace the rest of the upload to how fast the device answers
+            if self.measure_packet_interval:
+                round_trip = self._last_packet_time - start
+                self._packet_interval = min(self.packet_interval, round_trip)
+                logger.debug("Measured packet interval: %.6fs", round_trip)
+
+    def _send_packets(self, packets: Iterable[memoryview]) -> None:
+        """Sends packets to the device in order, as they are produced.
+
+        Args:
+            packets (Iterable[memoryview]): The packets to send, in order.
+        """
+        for packet in packets:
+            self._set_packet(packet)
 
     # TODO: Make a script that imports this module and sends text to the LED display
     def send_image(self, image_path: str) -> None:
-        image_raw_data = self._encode_image(image_path, debug=False)
+        image_raw_data = self._load_encoded_image(image_path)
 
         assert self.device, "Device is not set!"
-        try:
-            self.device.get_product_string()
-        except:
-            raise IOError("Could not communicate with device")
 
         commands = self._chunk_image_data(image_raw_data)
 
-        self._set_packet(FIRST_PACKET)
+        # The first report doubles as the check that the device responds
+        try:
+            self._set_packet(FIRST_PACKET)
+        except IOError as e:
+            raise IOError("Could not communicate with device") from e
 
         self._get_packet()
 
-        for packet in commands:
-            if self.dry_run:
-                print(f"Dry run: skipping command send: {packet!r}")
-            else:
-                self._set_packet(packet)
+        self._send_packets(commands)
 
     def send_animation(self, file_path: str = None, debug: bool = False):
         if not self.device:
             raise ValueError("Device is not set!")
 
-        try:
-            self.device.get_product_string()
-        except Exception as e:
-            raise IOError("Could not communicate with device") from e
-
         if debug or not file_path:
             # Load default test animation (TODO: replace with actual default path)
             file_path = "assets/debug_animation.gif"
-            logger.info(f"Debug mode active. Using debug animation: {file_path}")
+            logger.info("Debug mode active. Using debug animation: %s", file_path)
 
         file_path = Path(file_path)
         if not file_path.exists():
             raise FileNotFoundError(f"Animation file not found: {file_path}")
 
-        try:
-            with Image.open(file_path) as img:
-                logger.info(f"Opened animation: {file_path}")
-                frames = []
-                for i, frame in enumerate(ImageSequence.Iterator(img)):
-                    logger.debug(
-                        f"Processing frame {i} - mode: {frame.mode}, size: {frame.size}"
-                    )
-                    # Convert to RGB to ensure consistency
-                    converted = frame.convert("RGB")
-                    frames.append(self._encode_image(converted))
-        except UnidentifiedImageError:
-            raise ValueError(f"Unsupported image format: {file_path}")
-        except Exception as e:
-            logger.error(f"Failed to process animation: {e}")
-            raise
-
+        frames = self._load_encoded_animation(file_path)
         if not frames:
             raise ValueError("No frames extracted from animation")
 
         packets = self._chunk_animation_data(frames)
 
-        logger.info(f"Sending {len(packets)} animation packets")
+        logger.info(
+            "Sending %d animation packets",
+            sum(self._packet_count(frame) for frame in frames),
+        )
         first_packet = FIRST_PACKET
         # todo: fix TypeError: 'bytes' object does not support item assignment
         first_packet[2] = len(frames)
         # todo: check that gif has at least two frames
         first_packet[7] = 0xC8 - (len(frames) - 2)
-        self._set_packet(first_packet)
+
+        # The first report doubles as the check that the device responds
+        try:
+            self._set_packet(first_packet)
+        except IOError as e:
+            raise IOError("Could not communicate with device") from e
         self._get_packet()
 
-        for i, packet in enumerate(packets):
-            if self.dry_run:
-                logger.debug(f"Dry run: Skipping packet #{i}")
-            else:
-                logger.debug(f"Sending packet #{i}")
-                self._set_packet(packet)
+        self._send_packets(packets)
 
     def close_device(self) -> None:
         """Closes the USB HID device."""
@@ -1,12 +1,63 @@
 from PIL import Image, ImageDraw, ImageFont
 from epomakercontroller import EpomakerController
+from functools import lru_cache
+import atexit
 import os
 import argparse
+from typing import Any, Optional
+import numpy as np
+
+# Only used to measure text, the same way a draw on an RGB canvas would
+_MEASURE_DRAW = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+
+# Loaded once so the text caches below, keyed on the font, keep hitting
+_DEFAULT_FONT = ImageFont.load_default()
+
+# Shared controller for callers that don't pass their own, opened on first use
+_CONTROLLER: Optional[EpomakerController] = None
+
+
+@lru_cache(maxsize=256)
+def _text_length(text: str, font: Any) -> float:
+    """Width of the text in pixels, cached as the same strings are redrawn often."""
+    return _MEASURE_DRAW.textlength(text, font=font)
+
+
+@lru_cache(maxsize=256)
+def _text_mask(
+    text: str, font: Any, xy: tuple[float, float], size: tuple[int, int]
+) -> np.ndarray:
+    """
+    Coverage (0-255) of the text drawn at xy on a canvas of the given size.
+
+    Cached since the ticker redraws the same strings at the same positions, so
+    each one is only rasterized once and then blended in with any color.
+    """
+    image = Image.new("L", size, 0)
+    ImageDraw.Draw(image).text(xy, text, font=font, fill=255, anchor="lt")
+    mask = np.asarray(image, dtype=np.uint32)[..., np.newaxis]
+    mask.flags.writeable = False
+    return mask
+
+
+@lru_cache(maxsize=256)
+def _rgb(color: Any) -> np.ndarray:
+    """Resolves any fill PIL accepts (name, int, tuple...) to an RGB array."""
+    ink = np.array(Image.new("RGB", (1, 1), color).getpixel((0, 0)), dtype=np.uint32)
+    ink.flags.writeable = False
+    return ink
+
+
+def _blend_text(canvas: np.ndarray, mask: np.ndarray, color: Any) -> None:
+    """Blends the color into the canvas through the mask, rounding as PIL does."""
+    ink = _rgb(color)
+    blended = canvas * (255 - mask) + ink * mask + 128
+    canvas[...] = ((blended >> 8) + blended) >> 8
 
 
 def render_text_on_canvas(
     text_segments,
-    font=ImageFont.load_default(),
+    font=_DEFAULT_FONT,
     align="left",
     canvas_width=60,
     canvas_height=9,
@@ -27,11 +78,11 @@ def render_text_on_canvas(
     - image: PIL Image object with rendered text.
     """
 
-    image = Image.new("RGB", (canvas_width, canvas_height), color=(0, 0, 0))
-    draw = ImageDraw.Draw(image)
+    canvas = np.zeros((canvas_height, canvas_width, 3), dtype=np.uint32)
 
-    # Compute total text width
-    total_width = sum(draw.textlength(text, font=font) for text, _ in text_segments)
+    # Compute total text width, keeping each width for the segment advance
+    widths = [_text_length(text, font) for text, _ in text_segments]
+    total_width = sum(widths)
 
     # Determine starting x position based on alignment
     if align == "left":
@@ -46,9 +97,12 @@ def render_text_on_canvas(
     y = 0  # top-aligned
 
     # Draw each text segment
-    for segment_text, color in text_segments:
-        draw.text((x, y), segment_text, font=font, fill=color, anchor="lt")
-        x += draw.textlength(segment_text, font=font)
+    for (segment_text, color), width in zip(text_segments, widths):
+        mask = _text_mask(segment_text, font, (x, y), (canvas_width, canvas_height))
+        _blend_text(canvas, mask, color)
+        x += width
+
+    image = Image.fromarray(canvas.astype(np.uint8))
 
     if debug:
         output_directory = "debug_images"
@@ -59,15 +113,47 @@ def render_text_on_canvas(
     return image
 
 
-def send_text(colored_text=[("Hello, World!", (0, 0, 255))], font=None, debug=False):
+def _get_controller() -> EpomakerController:
+    """
+    Returns the shared controller, opening the device the first time.
+
+    Nothing is kept if opening the device fails, so every later call looks for
+    the keyboard and tries to open it again.
+    """
+    global _CONTROLLER
+    if _CONTROLLER is None:
+        controller = EpomakerController()
+        if not controller.open_device():
+            raise IOError("Failed to open device")
+        atexit.register(controller.close_device)
+        _CONTROLLER = controller
+    return _CONTROLLER
+
+
+def send_text(
+    colored_text=[("Hello, World!", (0, 0, 255))],
+    font=None,
+    debug=False,
+    controller=None,
+):
+    """
+    Renders the text segments and uploads them to the keyboard.
+
+    Parameters:
+    - colored_text: List of tuples like [(text1, color1), (text2, color2), ...].
+    - font: PIL ImageFont object (default: PIL's default font).
+    - debug: If True, saves the rendered image to disk.
+    - controller: An opened EpomakerController to send with. If None, a shared
+      controller is opened once and reused by later calls.
+    """
     if font is None:
-        font = ImageFont.load_default()
+        font = _DEFAULT_FONT
 
     image = render_text_on_canvas(colored_text, font=font, align="center", debug=debug)
 
-    controller = EpomakerController()
-    if controller.open_device():
-        controller.send_image(image)
+    if controller is None:
+        controller = _get_controller()
+    controller.send_image(image)
 
 
 if __name__ == "__main__":
@@ -1,23 +1,42 @@
 import requests
+from requests.adapters import HTTPAdapter
 import time
+from concurrent.futures import ThreadPoolExecutor
+from epomakercontroller import EpomakerController
 from graphics import send_text  # Assumes you render via image
 
+try:
+    import orjson  # Faster JSON parsing, optional
+except ImportError:
+    orjson = None
 
-# Shared function to fetch price data
-def get_stock_info(ticker):
-    url = f"https://api.nasdaq.com/api/quote/basic?&symbol={ticker}%7cstocks"
-    headers = {
+MAX_FETCH_WORKERS = 16  # tickers fetched at the same time
+FORCE_REDRAW_EVERY = 10  # unchanged updates skipped before redrawing anyway
+
+# One session for every request, so the TLS connection is kept alive and reused
+_SESSION = requests.Session()
+# Enough pooled connections for every concurrent fetch to keep its own
+_SESSION.mount("https://", HTTPAdapter(pool_maxsize=MAX_FETCH_WORKERS))
+_SESSION.headers.update(
+    {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
         "Accept": "application/json",
+        "Connection": "keep-alive",
     }
+)
+
+
+# Shared function to fetch price data
+def get_stock_info(ticker):
+    url = f"https://api.nasdaq.com/api/quote/basic?&symbol={ticker}%7cstocks"
 
     try:
-        response = requests.get(url, headers=headers)
+        response = _SESSION.get(url)
         if response.status_code <= 0:
             print(f"[HTTP Error] {ticker}: {response.status_code}")
             return None
 
-        data = response.json()
+        data = orjson.loads(response.content) if orjson else response.json()
         records = data.get("data", {}).get("records", [])
         if not records:
             print(f"[No Records] {ticker}")
@@ -62,18 +81,38 @@ def cycle_through_stocks(stocks=[], delay=0.5, update_delay=30):
         print("No tickers provided.")
         return
 
-    while True:
-        # Fetch latest stock data
-        stock_infos = []
-        for ticker in stocks:
-            info = get_stock_info(ticker)
-            if info:
-                stock_infos.append(info)
-
-        # Display each stock in a loop
-        start_time = time.time()
-        while time.time() - start_time < update_delay:
-            for stock in stock_infos:
+    # Keep the device open across updates rather than reopening it per ticker
+    with EpomakerController() as controller:
+        # The quote currently on the screen, and how many updates it has been
+        # kept there without redrawing
+        displayed = None
+        skipped = 0
+        # How many stocks have been shown, picks the next one to show
+        position = 0
+
+        while True:
+            # Fetch latest stock data, all tickers at once since each is a network
+            # round trip
+            with ThreadPoolExecutor(
+                max_workers=min(MAX_FETCH_WORKERS, len(stocks))
+            ) as executor:
+                stock_infos = [
+                    info for info in executor.map(get_stock_info, stocks) if info
+                ]
+
+            # Display one stock after another until the next refresh is due,
+            # checked between stocks so a slow upload can't push the refresh back
+            deadline = time.monotonic_ns() + int(update_delay * 1e9)
+            while time.monotonic_ns() < deadline:
+                if not stock_infos:
+                    time.sleep(delay)
+                    continue
+
+                # Carry on from where the previous refresh stopped, so tickers
+                # further down the list still get their turn
+                stock = stock_infos[position % len(stock_infos)]
+                position += 1
+
                 yellow = (255, 221, 0)
                 white = (255, 255, 255)
                 green = (0, 255, 0)
@@ -81,12 +120,24 @@ def cycle_through_stocks(stocks=[], delay=0.5, update_delay=30):
 
                 color = green if stock["deltaIndicator"] == "up" else red
 
-                segments = [
-                    (stock["ticker"] + " ", yellow),
-                    (stock["pctChange"], color),
-                ]
-
-                send_text(segments)
+                # Nothing to render or upload if the screen already shows
+                # this quote, but redraw now and then in case it didn't stick
+                quote = (
+                    stock["ticker"],
+                    stock["pctChange"],
+                    stock["deltaIndicator"],
+                )
+                if quote == displayed and skipped < FORCE_REDRAW_EVERY:
+                    skipped += 1
+                else:
+                    segments = [
+                        (stock["ticker"] + " ", yellow),
+                        (stock["pctChange"], color),
+                    ]
+
+                    send_text(segments, controller=controller)
+                    displayed = quote
+                    skipped = 0
                 time.sleep(delay)
 
 